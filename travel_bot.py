@@ -11,15 +11,18 @@ Features:
 """
 
 import os
-import json
+import orjson
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Callable, Awaitable, Tuple
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 import streamlit as st
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import hashlib
 import time
+import random
+import diskcache
+import ijson
+from pydantic import BaseModel
 
 # Load environment variables
 load_dotenv()
@@ -28,41 +31,59 @@ load_dotenv()
 logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
+# Per-attempt limit; a stalled call is cut off and retried rather than
+# left to drag out the whole plan
+_REQUEST_TIMEOUT = 20.0
+_MAX_ATTEMPTS = 2
+
+# Fixed sampling seed so identical requests give (near) reproducible answers
+_SEED = 42
+
 # Initialize OpenAI
 try:
-    from openai import OpenAI
+    from openai import AsyncOpenAI, APIConnectionError, APITimeoutError
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     if not OPENAI_API_KEY:
         st.error("⚠️ OPENAI_API_KEY not found in .env file")
         st.stop()
     
-    client = OpenAI(api_key=OPENAI_API_KEY)
+    # Retries are handled in EnhancedTravelPlannerAI._with_retry
+    aclient = AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=_REQUEST_TIMEOUT, max_retries=0)
 except Exception as e:
     st.error(f"Error initializing OpenAI: {str(e)}")
     st.stop()
 
+# Upper bound on a single AI call so one slow response can't stall the plan
+_CALL_TIMEOUT = 45
 
-class EnhancedTravelPlannerAI:
-    """Enhanced AI travel planner with better detail"""
-    
-    _cache = {}
-    
-    @staticmethod
-    def _get_cache_key(func_name: str, *args) -> str:
-        """Generate cache key"""
-        key = f"{func_name}_{'_'.join(map(str, args))}"
-        return hashlib.md5(key.encode()).hexdigest()
-    
-    @staticmethod
-    def get_destination_insights(destination: str) -> Dict[str, Any]:
-        """Get comprehensive destination insights"""
-        cache_key = EnhancedTravelPlannerAI._get_cache_key("insights", destination)
-        
-        if cache_key in EnhancedTravelPlannerAI._cache:
-            return EnhancedTravelPlannerAI._cache[cache_key]
-        
-        try:
-            prompt = f"""Provide detailed travel insights for {destination} as JSON:
+# Conservative output rate used to stretch the limit for long responses
+_TOKENS_PER_SECOND = 50
+
+# Output budgets for the sections requested without streaming
+_INSIGHTS_MAX_TOKENS = 1500
+_PACKING_MAX_TOKENS = 600
+_BUDGET_MAX_TOKENS = 500
+
+# Sections of a trip plan, in the order they are requested
+_PLAN_SECTIONS = ('insights', 'itinerary', 'budget', 'packing')
+
+# Indexed by month number (index 0 unused)
+_SEASON_BY_MONTH = (
+    None, 'winter', 'winter', 'spring', 'spring', 'spring', 'summer',
+    'summer', 'summer', 'fall', 'fall', 'fall', 'winter'
+)
+
+# ==================== Prompt Templates ====================
+# Built once at import; each call only fills in the trip details
+
+# System messages are shared as-is; only the user message is built per call
+_SYS_INSIGHTS = {"role": "system", "content": "You are an expert travel guide providing detailed, accurate information."}
+_SYS_ITINERARY = {"role": "system", "content": "You are a professional travel planner creating detailed, realistic itineraries with specific recommendations."}
+_SYS_PACKING = {"role": "system", "content": "You are an experienced traveler creating practical, specific packing lists."}
+_SYS_BUDGET = {"role": "system", "content": "You are a travel budget advisor giving realistic cost estimates."}
+_SYS_PLAN = {"role": "system", "content": "You are a professional travel planner creating detailed, realistic itineraries, budgets, packing lists and destination guides."}
+
+_INSIGHTS_PROMPT = """Provide detailed travel insights for {destination} as JSON:
 
 {{
   "description": "2-3 sentence overview of what makes this destination special",
@@ -97,33 +118,7 @@ class EnhancedTravelPlannerAI:
 
 Be thorough and practical."""
 
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert travel guide providing detailed, accurate information."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=1500,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            EnhancedTravelPlannerAI._cache[cache_key] = result
-            return result
-        except Exception as e:
-            logger.error(f"Insights error: {e}")
-            return {}
-    
-    @staticmethod
-    def create_daily_itinerary(destination: str, origin: str, days: int, 
-                              preferences: List[str], budget_level: str,
-                              start_date: str) -> List[Dict]:
-        """Generate detailed daily itinerary"""
-        try:
-            prefs_str = ', '.join(preferences) if preferences else 'general sightseeing'
-            
-            prompt = f"""Create a detailed {days}-day itinerary for {destination}.
+_ITINERARY_PROMPT = """Create a detailed {days}-day itinerary for {destination}.
 
 Trip details:
 - Starting from: {origin}
@@ -132,7 +127,7 @@ Trip details:
 - Start date: {start_date}
 
 For EACH day provide detailed JSON:
-[{{
+{{"itinerary": [{{
   "day": 1,
   "date": "{start_date}",
   "title": "Descriptive day theme (e.g., Historic Heart & Local Flavors)",
@@ -141,19 +136,15 @@ For EACH day provide detailed JSON:
       "time": "8:00 AM",
       "activity": "Breakfast at...",
       "description": "Why this is great, what to expect (2-3 sentences)",
-      "duration": "1 hour",
       "cost": 15,
-      "location": "neighborhood/address",
-      "tips": "insider tip"
+      "location": "neighborhood/address"
     }},
     {{
       "time": "9:30 AM",
       "activity": "Visit Main Attraction",
       "description": "Detailed explanation of what you'll see and experience",
-      "duration": "2-3 hours",
       "cost": 25,
-      "location": "specific area",
-      "tips": "best time to visit, what to bring"
+      "location": "specific area"
     }}
   ],
   "afternoon": [
@@ -161,19 +152,15 @@ For EACH day provide detailed JSON:
       "time": "1:00 PM",
       "activity": "Lunch suggestion",
       "description": "What to try, atmosphere",
-      "duration": "1.5 hours",
       "cost": 20,
-      "location": "area",
-      "tips": "reservation tips"
+      "location": "area"
     }},
     {{
       "time": "3:00 PM",
       "activity": "Afternoon activity",
       "description": "Full experience description",
-      "duration": "2 hours",
       "cost": 30,
-      "location": "where",
-      "tips": "practical advice"
+      "location": "where"
     }}
   ],
   "evening": [
@@ -181,61 +168,30 @@ For EACH day provide detailed JSON:
       "time": "7:00 PM",
       "activity": "Dinner & evening plans",
       "description": "Evening experience details",
-      "duration": "2-3 hours",
       "cost": 50,
-      "location": "area",
-      "tips": "what to wear, reservations"
+      "location": "area"
     }}
   ],
   "transportation": "How to get around this day (metro lines, walking routes, etc)",
   "total_cost": 140,
-  "energy_level": "moderate",
-  "weather_considerations": "what to prepare for",
-  "flexibility_note": "optional activities if time permits"
-}}]
+  "energy_level": "moderate"
+}}]}}
 
-Make it realistic with proper timing, real locations, and practical advice. 
+{detail_note}Make it realistic with proper timing, real locations, and practical advice. 
 Day 1 should include arrival from {origin}.
 Last day should account for departure logistics.
 Each activity should have meaningful descriptions, not generic statements."""
 
-            response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": "You are a professional travel planner creating detailed, realistic itineraries with specific recommendations."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.8,
-                max_tokens=500 * days,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            itinerary = result.get("itinerary", result.get("days", []))
-            
-            # Ensure dates are properly set
-            for i, day in enumerate(itinerary):
-                day_date = datetime.fromisoformat(start_date) + timedelta(days=i)
-                day['date'] = day_date.strftime('%Y-%m-%d')
-                day['day_of_week'] = day_date.strftime('%A')
-            
-            return itinerary
-        except Exception as e:
-            logger.error(f"Itinerary error: {e}")
-            return []
-    
-    @staticmethod
-    def get_packing_list(destination: str, days: int, season: str,
-                        activities: List[str]) -> Dict[str, List[str]]:
-        """Detailed packing list"""
-        cache_key = EnhancedTravelPlannerAI._get_cache_key("packing", destination, season, str(activities))
-        
-        if cache_key in EnhancedTravelPlannerAI._cache:
-            return EnhancedTravelPlannerAI._cache[cache_key]
-        
-        try:
-            prompt = f"""Create comprehensive packing list for {destination} in {season}, {days} days.
-Activities: {', '.join(activities)}
+# Extra per-activity detail is only requested for short trips; on long
+# trips it multiplies the output tokens and therefore the wait
+_ITINERARY_DETAIL_NOTE = """Also give each activity a "duration" (e.g. "2 hours") and "tips" (an insider tip),
+and give each day "weather_considerations" and "flexibility_note" (optional activities if time permits).
+
+"""
+_ITINERARY_DETAIL_MAX_DAYS = 5
+
+_PACKING_PROMPT = """Create comprehensive packing list for {destination} in {season}, {days} days.
+Activities: {activities}
 
 JSON format:
 {{
@@ -252,27 +208,7 @@ JSON format:
 
 Be specific about quantities and reasons (e.g., "Light rain jacket - afternoon showers common")"""
 
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.6,
-                max_tokens=600,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            EnhancedTravelPlannerAI._cache[cache_key] = result
-            return result
-        except Exception as e:
-            logger.error(f"Packing error: {e}")
-            return {}
-    
-    @staticmethod
-    def get_budget_breakdown(destination: str, days: int, travelers: int,
-                           budget_level: str) -> Dict[str, Any]:
-        """Detailed budget estimates"""
-        try:
-            prompt = f"""Create detailed budget breakdown for {travelers} traveler(s) in {destination} for {days} days ({budget_level} level).
+_BUDGET_PROMPT = """Create detailed budget breakdown for {travelers} traveler(s) in {destination} for {days} days ({budget_level} level).
 
 JSON format:
 {{
@@ -313,86 +249,691 @@ JSON format:
 
 Provide realistic estimates with context."""
 
-            response = client.chat.completions.create(
+_FUSED_PROMPT = """Plan a complete trip and return ONE JSON object with exactly these top-level keys, in this order:
+"itinerary", "insights", "budget", "packing".
+
+"itinerary" is the list of days described in the ITINERARY section. "insights", "budget" and "packing"
+are the objects described in their sections.
+
+## ITINERARY
+{itinerary}
+
+## INSIGHTS
+{insights}
+
+## BUDGET
+{budget}
+
+## PACKING
+{packing}"""
+
+
+# ==================== Response Schemas ====================
+# Passed as response_format so the API returns schema-conforming JSON.
+# Structured outputs makes every property required, so the extra detail
+# asked for on short trips lives in the Detailed* subclasses; long trips
+# use the base models and never emit those keys at all.
+
+class Activity(BaseModel):
+    time: str
+    activity: str
+    description: str
+    cost: int
+    location: str
+
+
+class DetailedActivity(Activity):
+    duration: str
+    tips: str
+
+
+class DayPlan(BaseModel):
+    day: int
+    date: str
+    title: str
+    morning: List[Activity]
+    afternoon: List[Activity]
+    evening: List[Activity]
+    transportation: str
+    total_cost: int
+    energy_level: str
+
+
+class DetailedDayPlan(DayPlan):
+    morning: List[DetailedActivity]
+    afternoon: List[DetailedActivity]
+    evening: List[DetailedActivity]
+    weather_considerations: str
+    flexibility_note: str
+
+
+class Itinerary(BaseModel):
+    itinerary: List[DayPlan]
+
+
+class DetailedItinerary(BaseModel):
+    itinerary: List[DetailedDayPlan]
+
+
+class DailyBudget(BaseModel):
+    budget: int
+    mid_range: int
+    luxury: int
+
+
+class Attraction(BaseModel):
+    name: str
+    description: str
+    time_needed: str
+    cost: int
+
+
+class Dish(BaseModel):
+    dish: str
+    description: str
+    where: str
+
+
+class SafetyInfo(BaseModel):
+    rating: int
+    notes: str
+
+
+class SeasonalWeather(BaseModel):
+    spring: str
+    summer: str
+    fall: str
+    winter: str
+
+
+class LocalTransport(BaseModel):
+    getting_around: str
+    from_airport: str
+
+
+class Neighborhood(BaseModel):
+    name: str
+    vibe: str
+    best_for: str
+
+
+class Insights(BaseModel):
+    description: str
+    best_time_to_visit: str
+    average_daily_budget: DailyBudget
+    top_attractions: List[Attraction]
+    local_cuisine: List[Dish]
+    cultural_tips: List[str]
+    safety_info: SafetyInfo
+    weather_by_season: SeasonalWeather
+    transportation: LocalTransport
+    language_tips: List[str]
+    currency: str
+    neighborhoods: List[Neighborhood]
+
+
+class AccommodationCost(BaseModel):
+    per_night: int
+    total_nights: int
+    total: int
+    notes: str
+
+
+class FoodCost(BaseModel):
+    breakfast_avg: int
+    lunch_avg: int
+    dinner_avg: int
+    daily_total: int
+    trip_total: int
+
+
+class TransportationCost(BaseModel):
+    airport_transfer: int
+    daily_local: int
+    total: int
+    notes: str
+
+
+class ActivitiesCost(BaseModel):
+    daily_avg: int
+    total: int
+    notes: str
+
+
+class ShoppingCost(BaseModel):
+    budget: int
+    notes: str
+
+
+class Budget(BaseModel):
+    accommodation: AccommodationCost
+    food: FoodCost
+    transportation: TransportationCost
+    activities: ActivitiesCost
+    shopping: ShoppingCost
+    emergency_fund: int
+    total_per_person: int
+    total_all_travelers: int
+    daily_average: int
+    savings_tips: List[str]
+
+
+class Packing(BaseModel):
+    documents: List[str]
+    clothing: List[str]
+    footwear: List[str]
+    toiletries: List[str]
+    electronics: List[str]
+    medications: List[str]
+    accessories: List[str]
+    activity_specific: List[str]
+    optional: List[str]
+
+
+class TripPlan(BaseModel):
+    # Itinerary first so its days stream in before the other sections
+    itinerary: List[DayPlan]
+    insights: Insights
+    budget: Budget
+    packing: Packing
+
+
+class DetailedTripPlan(TripPlan):
+    itinerary: List[DetailedDayPlan]
+
+
+@st.cache_resource
+def _get_response_cache() -> diskcache.Cache:
+    """Open the AI response cache once per process rather than on every rerun"""
+    return diskcache.Cache('.travel_cache', size_limit=2**30)
+
+
+class EnhancedTravelPlannerAI:
+    """Enhanced AI travel planner with better detail"""
+    
+    # Disk-backed so identical queries survive Streamlit reruns and restarts
+    _cache = _get_response_cache()
+    _cache_expire = 86400 * 30
+    
+    @staticmethod
+    def _get_cache_key(func_name: str, *args) -> str:
+        """Generate cache key (pass lists as sorted tuples so order doesn't matter)"""
+        # Short and unique already, so it is used as-is rather than hashed
+        return f"{func_name}_{'_'.join(map(str, args))}"
+    
+    @staticmethod
+    def _insights_key(destination: str) -> str:
+        """Cache key for destination insights"""
+        return EnhancedTravelPlannerAI._get_cache_key("insights", destination.strip().lower())
+    
+    @staticmethod
+    def _itinerary_key(destination: str, origin: str, days: int, preferences: List[str],
+                       budget_level: str, start_date: str) -> str:
+        """Cache key for a daily itinerary"""
+        # Origin sets the arrival and departure plans and the season sets the
+        # weather advice, so both are keyed. The exact date is not: day dates
+        # are re-stamped on every read
+        season = _SEASON_BY_MONTH[datetime.fromisoformat(start_date).month]
+        return EnhancedTravelPlannerAI._get_cache_key(
+            "itinerary", destination.strip().lower(), origin.strip().lower(), season, days,
+            tuple(sorted(p.lower() for p in preferences)), budget_level
+        )
+    
+    @staticmethod
+    def _packing_key(destination: str, days: int, season: str, activities: List[str]) -> str:
+        """Cache key for a packing list"""
+        return EnhancedTravelPlannerAI._get_cache_key(
+            "packing", destination.strip().lower(), days, season, tuple(sorted(a.lower() for a in activities))
+        )
+    
+    @staticmethod
+    def _budget_key(destination: str, days: int, travelers: int, budget_level: str) -> str:
+        """Cache key for a budget breakdown"""
+        return EnhancedTravelPlannerAI._get_cache_key("budget", destination.strip().lower(), days, travelers, budget_level)
+    
+    @staticmethod
+    async def _with_retry(call: Callable[[], Awaitable[Any]],
+                          can_retry: Callable[[], bool] = lambda: True) -> Any:
+        """Run an AI call, retrying with jittered backoff on timeouts and dropped connections"""
+        for attempt in range(_MAX_ATTEMPTS):
+            try:
+                return await call()
+            except (APITimeoutError, APIConnectionError, asyncio.TimeoutError) as e:
+                if attempt == _MAX_ATTEMPTS - 1 or not can_retry():
+                    raise
+                logger.warning(f"Retrying AI call after {e!r}")
+                await asyncio.sleep(0.5 * 2 ** attempt + random.random() * 0.3)
+    
+    @staticmethod
+    def _parse_timeout(max_tokens: int) -> float:
+        """Per-attempt limit for a non-streamed call, which returns nothing until fully written"""
+        return _REQUEST_TIMEOUT + max_tokens / _TOKENS_PER_SECOND
+    
+    @staticmethod
+    def _section_timeout(max_tokens: int) -> float:
+        """Overall limit for a non-streamed section, covering every attempt and the backoff between them"""
+        return _MAX_ATTEMPTS * (EnhancedTravelPlannerAI._parse_timeout(max_tokens) + 1)
+    
+    @staticmethod
+    async def _parse_completion(max_tokens: int, **kwargs) -> BaseModel:
+        """Request a structured completion and return the parsed response"""
+        timeout = EnhancedTravelPlannerAI._parse_timeout(max_tokens)
+        # The client's own timeout is raised too, or it would still cut the call at _REQUEST_TIMEOUT
+        response = await EnhancedTravelPlannerAI._with_retry(
+            lambda: asyncio.wait_for(
+                aclient.chat.completions.parse(max_tokens=max_tokens, timeout=timeout, **kwargs),
+                timeout=timeout
+            )
+        )
+        return response.choices[0].message.parsed
+    
+    @staticmethod
+    def _insights_prompt(destination: str) -> str:
+        """Build the destination insights prompt"""
+        return _INSIGHTS_PROMPT.format(destination=destination)
+    
+    @staticmethod
+    async def get_destination_insights(destination: str) -> Dict[str, Any]:
+        """Get comprehensive destination insights"""
+        cache_key = EnhancedTravelPlannerAI._insights_key(destination)
+        
+        cached = EnhancedTravelPlannerAI._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = EnhancedTravelPlannerAI._insights_prompt(destination)
+
+            parsed = await EnhancedTravelPlannerAI._parse_completion(
                 model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.5,
-                max_tokens=500,
-                response_format={"type": "json_object"}
+                messages=[_SYS_INSIGHTS, {"role": "user", "content": prompt}],
+                temperature=0.3,
+                seed=_SEED,
+                max_tokens=_INSIGHTS_MAX_TOKENS,
+                response_format=Insights
             )
             
-            return json.loads(response.choices[0].message.content)
+            result = parsed.model_dump()
+            EnhancedTravelPlannerAI._cache.set(cache_key, result, expire=EnhancedTravelPlannerAI._cache_expire)
+            return result
+        except Exception as e:
+            logger.error(f"Insights error: {e}")
+            return {}
+    
+    @staticmethod
+    def _set_day_date(day: Dict, base: datetime, offset: int):
+        """Stamp a day with its calendar date counted from the trip start"""
+        day_date = base + timedelta(days=offset)
+        day['date'] = day_date.isoformat()[:10]
+        day['day_of_week'] = day_date.strftime('%A')
+    
+    @staticmethod
+    def _day_collector(start_date: str, on_day: Optional[Callable[[Dict], None]]):
+        """Return a list and a callback that dates each day, appends it and passes it on to on_day"""
+        itinerary = []
+        base_date = datetime.fromisoformat(start_date)
+        
+        def add_day(day: Dict):
+            EnhancedTravelPlannerAI._set_day_date(day, base_date, len(itinerary))
+            itinerary.append(day)
+            if on_day:
+                on_day(day)
+        
+        return itinerary, add_day
+    
+    @staticmethod
+    async def _stream_completion(on_day: Callable[[Dict], None], **kwargs) -> BaseModel:
+        """Stream a structured completion, handing each itinerary day to on_day as soon as it is complete"""
+        days_sent = 0
+        
+        async def attempt():
+            nonlocal days_sent
+            # Pull each day out of the partial JSON under the "itinerary" key
+            parsed_days = ijson.sendable_list()
+            parser = ijson.items_coro(parsed_days, 'itinerary.item', use_float=True)
+            
+            async with aclient.chat.completions.stream(**kwargs) as stream:
+                async for event in stream:
+                    if event.type != "content.delta":
+                        continue
+                    parser.send(event.delta.encode())
+                    for day in parsed_days:
+                        days_sent += 1
+                        on_day(day)
+                    del parsed_days[:]
+                completion = await stream.get_final_completion()
+            parser.close()
+            
+            return completion.choices[0].message.parsed
+        
+        # A retry after days were handed out would repeat them, so only
+        # failures before the first day are retried
+        return await EnhancedTravelPlannerAI._with_retry(attempt, can_retry=lambda: days_sent == 0)
+    
+    @staticmethod
+    def _itinerary_prompt(destination: str, origin: str, days: int,
+                          preferences: List[str], budget_level: str,
+                          start_date: str) -> str:
+        """Build the daily itinerary prompt"""
+        prefs_str = ', '.join(preferences) if preferences else 'general sightseeing'
+        
+        return _ITINERARY_PROMPT.format(
+            destination=destination, origin=origin, days=days,
+            prefs_str=prefs_str, budget_level=budget_level, start_date=start_date,
+            detail_note=_ITINERARY_DETAIL_NOTE if days <= _ITINERARY_DETAIL_MAX_DAYS else ""
+        )
+    
+    @staticmethod
+    def _itinerary_max_tokens(days: int) -> int:
+        """Output token budget for an itinerary of the given length"""
+        per_day = 500 if days <= _ITINERARY_DETAIL_MAX_DAYS else 350
+        return per_day * days
+    
+    @staticmethod
+    async def create_daily_itinerary(destination: str, origin: str, days: int, 
+                              preferences: List[str], budget_level: str,
+                              start_date: str,
+                              on_day: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+        """Generate detailed daily itinerary, handing each day to on_day as it arrives"""
+        cache_key = EnhancedTravelPlannerAI._itinerary_key(
+            destination, origin, days, preferences, budget_level, start_date
+        )
+        
+        cached = EnhancedTravelPlannerAI._cache.get(cache_key)
+        itinerary, add_day = EnhancedTravelPlannerAI._day_collector(start_date, on_day)
+        
+        try:
+            if cached is not None:
+                for day in cached:
+                    add_day(day)
+                return itinerary
+            
+            prompt = EnhancedTravelPlannerAI._itinerary_prompt(
+                destination, origin, days, preferences, budget_level, start_date
+            )
+
+            max_tokens = EnhancedTravelPlannerAI._itinerary_max_tokens(days)
+            
+            # The limit is applied here rather than by the caller so a timeout
+            # still returns the days that were complete
+            await asyncio.wait_for(
+                EnhancedTravelPlannerAI._stream_completion(
+                    add_day,
+                    model="gpt-4o",
+                    messages=[_SYS_ITINERARY, {"role": "user", "content": prompt}],
+                    temperature=0.6,
+                    seed=_SEED,
+                    max_tokens=max_tokens,
+                    response_format=(DetailedItinerary if days <= _ITINERARY_DETAIL_MAX_DAYS
+                                     else Itinerary)
+                ),
+                timeout=_CALL_TIMEOUT + max_tokens / _TOKENS_PER_SECOND
+            )
+            
+            if itinerary:
+                EnhancedTravelPlannerAI._cache.set(cache_key, itinerary, expire=EnhancedTravelPlannerAI._cache_expire)
+            
+            return itinerary
+        except Exception as e:
+            logger.error(f"Itinerary error: {e}")
+            # Keep whatever days were complete before the failure
+            return itinerary
+    
+    @staticmethod
+    def _packing_prompt(destination: str, days: int, season: str,
+                        activities: List[str]) -> str:
+        """Build the packing list prompt"""
+        return _PACKING_PROMPT.format(
+            destination=destination, days=days, season=season,
+            activities=', '.join(activities)
+        )
+    
+    @staticmethod
+    async def get_packing_list(destination: str, days: int, season: str,
+                        activities: List[str]) -> Dict[str, List[str]]:
+        """Detailed packing list"""
+        cache_key = EnhancedTravelPlannerAI._packing_key(destination, days, season, activities)
+        
+        cached = EnhancedTravelPlannerAI._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = EnhancedTravelPlannerAI._packing_prompt(destination, days, season, activities)
+
+            parsed = await EnhancedTravelPlannerAI._parse_completion(
+                model="gpt-4o-mini",
+                messages=[_SYS_PACKING, {"role": "user", "content": prompt}],
+                temperature=0.3,
+                seed=_SEED,
+                max_tokens=_PACKING_MAX_TOKENS,
+                response_format=Packing
+            )
+            
+            result = parsed.model_dump()
+            EnhancedTravelPlannerAI._cache.set(cache_key, result, expire=EnhancedTravelPlannerAI._cache_expire)
+            return result
+        except Exception as e:
+            logger.error(f"Packing error: {e}")
+            return {}
+    
+    @staticmethod
+    def _budget_prompt(destination: str, days: int, travelers: int,
+                       budget_level: str) -> str:
+        """Build the budget breakdown prompt"""
+        return _BUDGET_PROMPT.format(
+            destination=destination, days=days, travelers=travelers,
+            budget_level=budget_level
+        )
+    
+    @staticmethod
+    async def get_budget_breakdown(destination: str, days: int, travelers: int,
+                           budget_level: str) -> Dict[str, Any]:
+        """Detailed budget estimates"""
+        cache_key = EnhancedTravelPlannerAI._budget_key(destination, days, travelers, budget_level)
+        
+        cached = EnhancedTravelPlannerAI._cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        try:
+            prompt = EnhancedTravelPlannerAI._budget_prompt(destination, days, travelers, budget_level)
+
+            parsed = await EnhancedTravelPlannerAI._parse_completion(
+                model="gpt-4o-mini",
+                messages=[_SYS_BUDGET, {"role": "user", "content": prompt}],
+                temperature=0.3,
+                seed=_SEED,
+                max_tokens=_BUDGET_MAX_TOKENS,
+                response_format=Budget
+            )
+            
+            result = parsed.model_dump()
+            EnhancedTravelPlannerAI._cache.set(cache_key, result, expire=EnhancedTravelPlannerAI._cache_expire)
+            return result
         except Exception as e:
             logger.error(f"Budget error: {e}")
             return {}
     
     @staticmethod
-    def generate_all_parallel(origin: str, destination: str, days: int, 
-                            travelers: int, preferences: List[str], 
-                            budget_level: str, season: str,
-                            start_date: str) -> Dict[str, Any]:
-        """Run all AI calls in parallel"""
-        results = {
-            'insights': None,
-            'itinerary': None,
-            'budget': None,
-            'packing': None,
-            'errors': []
+    async def generate_all_async(origin: str, destination: str, days: int,
+                                 travelers: int, preferences: List[str],
+                                 budget_level: str, season: str,
+                                 start_date: str,
+                                 on_day: Optional[Callable[[Dict], None]] = None,
+                                 sections: Tuple[str, ...] = _PLAN_SECTIONS) -> Dict[str, Any]:
+        """Run the AI calls for the requested sections concurrently on one event loop"""
+        calls = {
+            'insights': (lambda: EnhancedTravelPlannerAI.get_destination_insights(destination),
+                         EnhancedTravelPlannerAI._section_timeout(_INSIGHTS_MAX_TOKENS)),
+            # Times itself out and returns the days completed so far
+            'itinerary': (lambda: EnhancedTravelPlannerAI.create_daily_itinerary(
+                destination, origin, days, preferences, budget_level, start_date, on_day
+            ), None),
+            'budget': (lambda: EnhancedTravelPlannerAI.get_budget_breakdown(
+                destination, days, travelers, budget_level
+            ), EnhancedTravelPlannerAI._section_timeout(_BUDGET_MAX_TOKENS)),
+            'packing': (lambda: EnhancedTravelPlannerAI.get_packing_list(
+                destination, days, season, preferences
+            ), EnhancedTravelPlannerAI._section_timeout(_PACKING_MAX_TOKENS))
         }
         
-        def run_insights():
-            try:
-                return ('insights', EnhancedTravelPlannerAI.get_destination_insights(destination))
-            except Exception as e:
-                return ('insights', {'error': str(e)})
+        outcomes = await asyncio.gather(
+            *(asyncio.wait_for(calls[key][0](), timeout=calls[key][1]) for key in sections),
+            return_exceptions=True
+        )
         
-        def run_itinerary():
-            try:
-                return ('itinerary', EnhancedTravelPlannerAI.create_daily_itinerary(
-                    destination, origin, days, preferences, budget_level, start_date
-                ))
-            except Exception as e:
-                return ('itinerary', {'error': str(e)})
+        results = {'errors': []}
+        for key, outcome in zip(sections, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"{key} failed: {outcome!r}")
+                results['errors'].append(f"{key}: {outcome!r}")
+                outcome = [] if key == 'itinerary' else {}
+            results[key] = outcome
         
-        def run_budget():
-            try:
-                return ('budget', EnhancedTravelPlannerAI.get_budget_breakdown(
-                    destination, days, travelers, budget_level
-                ))
-            except Exception as e:
-                return ('budget', {'error': str(e)})
+        return results
+    
+    @staticmethod
+    async def generate_all_fused(origin: str, destination: str, days: int,
+                                 travelers: int, preferences: List[str],
+                                 budget_level: str, season: str,
+                                 start_date: str,
+                                 on_day: Optional[Callable[[Dict], None]] = None) -> Dict[str, Any]:
+        """Generate the whole plan in a single AI call, streaming itinerary days to on_day"""
+        cache_keys = {
+            'insights': EnhancedTravelPlannerAI._insights_key(destination),
+            'itinerary': EnhancedTravelPlannerAI._itinerary_key(
+                destination, origin, days, preferences, budget_level, start_date
+            ),
+            'budget': EnhancedTravelPlannerAI._budget_key(destination, days, travelers, budget_level),
+            'packing': EnhancedTravelPlannerAI._packing_key(destination, days, season, preferences)
+        }
         
-        def run_packing():
-            try:
-                return ('packing', EnhancedTravelPlannerAI.get_packing_list(
-                    destination, days, season, preferences
-                ))
-            except Exception as e:
-                return ('packing', {'error': str(e)})
-        
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = [
-                executor.submit(run_insights),
-                executor.submit(run_itinerary),
-                executor.submit(run_budget),
-                executor.submit(run_packing)
-            ]
+        # Reuse cached pieces and only generate what is missing
+        if any(key in EnhancedTravelPlannerAI._cache for key in cache_keys.values()):
+            return await EnhancedTravelPlannerAI.generate_all_async(
+                origin, destination, days, travelers, preferences,
+                budget_level, season, start_date, on_day
+            )
+        
+        itinerary, add_day = EnhancedTravelPlannerAI._day_collector(start_date, on_day)
+        
+        prompt = _FUSED_PROMPT.format(
+            itinerary=EnhancedTravelPlannerAI._itinerary_prompt(
+                destination, origin, days, preferences, budget_level, start_date
+            ),
+            insights=EnhancedTravelPlannerAI._insights_prompt(destination),
+            budget=EnhancedTravelPlannerAI._budget_prompt(destination, days, travelers, budget_level),
+            packing=EnhancedTravelPlannerAI._packing_prompt(destination, days, season, preferences)
+        )
+        
+        # The other three sections add about 2600 output tokens
+        max_tokens = EnhancedTravelPlannerAI._itinerary_max_tokens(days) + 2600
+        
+        try:
+            plan = await asyncio.wait_for(
+                EnhancedTravelPlannerAI._stream_completion(
+                    add_day,
+                    model="gpt-4o",
+                    messages=[_SYS_PLAN, {"role": "user", "content": prompt}],
+                    temperature=0.6,
+                    seed=_SEED,
+                    max_tokens=max_tokens,
+                    response_format=(DetailedTripPlan if days <= _ITINERARY_DETAIL_MAX_DAYS
+                                     else TripPlan)
+                ),
+                timeout=_CALL_TIMEOUT + max_tokens / _TOKENS_PER_SECOND
+            )
+            result = plan.model_dump(exclude={'itinerary'})
+            result['itinerary'] = itinerary
             
-            for future in as_completed(futures):
-                try:
-                    key, value = future.result()
-                    results[key] = value
-                except Exception as e:
-                    results['errors'].append(str(e))
+            # Store each piece on its own so later plans can reuse them
+            # separately; only a complete plan is cached
+            if len(itinerary) == days:
+                for key, cache_key in cache_keys.items():
+                    EnhancedTravelPlannerAI._cache.set(cache_key, result[key], expire=EnhancedTravelPlannerAI._cache_expire)
+        except Exception as e:
+            logger.error(f"Fused plan error: {e!r}")
+            # Fall back to one call per section. Days already shown are kept
+            # rather than generated and shown a second time
+            sections = tuple(key for key in _PLAN_SECTIONS if key != 'itinerary' or not itinerary)
+            results = await EnhancedTravelPlannerAI.generate_all_async(
+                origin, destination, days, travelers, preferences,
+                budget_level, season, start_date, on_day, sections
+            )
+            results['errors'].insert(0, f"plan: {e!r}")
+            results.setdefault('itinerary', itinerary)
+            return results
         
-        return results
+        return {'errors': [], **result}
 
 
 # ==================== Streamlit App ====================
 
+# Static welcome screen content
+_WELCOME_COLS = (
+    ("⚡ Fast & Detailed", "Get comprehensive itineraries in 15-30 seconds with hour-by-hour planning"),
+    ("🎯 AI-Powered", "Smart recommendations based on your preferences and budget"),
+    ("📍 Real Places", "Actual attractions, restaurants, and local tips from AI knowledge")
+)
+
+# One block for everything below the columns, so it is a single element
+_WELCOME_BODY_MD = """
+---
+
+### 🌟 What You'll Get:
+
+- **Detailed Daily Itineraries** - Hour-by-hour plans with descriptions, costs, and insider tips
+- **Visual Calendar View** - See your entire trip at a glance
+- **Destination Guide** - Learn about attractions, food, culture, and safety
+- **Complete Budget Breakdown** - Know exactly what to expect to spend
+- **Smart Packing List** - Don't forget anything important
+- **Downloadable Plans** - Take your itinerary offline
+
+---
+
+### 💡 Pro Tips:
+
+- **Origin matters** - We'll plan your arrival and departure logistics
+- **Pick 2-3 interests** - More focused = better recommendations  
+- **Budget level** - This affects accommodation, dining, and activity choices
+- **Trip length** - 3-7 days works best, longer trips take more time to generate
+"""
+
+
 def init_session_state():
     if 'trip_plan' not in st.session_state:
         st.session_state.trip_plan = None
+    if 'plan_key' not in st.session_state:
+        st.session_state.plan_key = None
+
+
+# The plan itself is passed as an unhashed argument; plan_key identifies it
+
+@st.cache_data(max_entries=20)
+def _plan_to_json(plan_key: str, _plan: Dict) -> str:
+    """Serialize the plan for download once per generated plan"""
+    # Underscore keys are UI bookkeeping, not part of the itinerary
+    public = {k: v for k, v in _plan.items() if not k.startswith('_')}
+    return orjson.dumps(public, option=orjson.OPT_INDENT_2).decode()
+
+
+@st.cache_data(max_entries=20)
+def _plan_share_text(plan_key: str, _plan: Dict) -> str:
+    """Build the shareable trip summary once per generated plan"""
+    highlight_days = _plan.get('itinerary', [])[:5]  # First 5 days
+    highlights = "\n".join(f"Day {day.get('day')}: {day.get('title') or 'Explore'}" for day in highlight_days)
+    
+    return f"""
+🌍 Trip to {_plan['destination']}
+📅 {_plan['dates']}
+✈️ From {_plan['origin']}
+👥 {_plan['travelers']} travelers
+💰 {_plan['budget_level']} budget
+
+Daily Highlights:
+
+{highlights}"""
 
 
 def render_calendar_view(itinerary: List[Dict], start_date: str):
@@ -400,73 +941,98 @@ def render_calendar_view(itinerary: List[Dict], start_date: str):
     st.markdown("### 📅 Trip Timeline")
     
     for day in itinerary:
-        day_num = day.get('day', 0)
-        date_str = day.get('date', start_date)
-        day_of_week = day.get('day_of_week', '')
-        title = day.get('title', f'Day {day_num}')
-        
-        # Calendar card for each day
-        st.markdown(f"""
-        <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
-                    padding: 1rem; border-radius: 10px; margin: 1rem 0; color: white;'>
-            <h3 style='margin: 0; color: white;'>Day {day_num} - {day_of_week}</h3>
-            <p style='margin: 0.5rem 0 0 0; opacity: 0.9;'>{date_str} • {title}</p>
-        </div>
-        """, unsafe_allow_html=True)
-        
-        # Timeline for the day
-        col1, col2, col3 = st.columns([1, 1, 1])
-        
-        with col1:
-            st.markdown("**🌅 Morning**")
-            for act in day.get('morning', []):
-                with st.container():
-                    st.markdown(f"**{act.get('time', '')}** - {act.get('activity', '')}")
-                    if act.get('description'):
-                        st.caption(act['description'])
-                    st.caption(f"📍 {act.get('location', '')} • ⏱️ {act.get('duration', '')} • 💵 ${act.get('cost', 0)}")
-                    if act.get('tips'):
-                        st.info(f"💡 {act['tips']}")
-                    st.markdown("---")
-        
-        with col2:
-            st.markdown("**☀️ Afternoon**")
-            for act in day.get('afternoon', []):
-                with st.container():
-                    st.markdown(f"**{act.get('time', '')}** - {act.get('activity', '')}")
-                    if act.get('description'):
-                        st.caption(act['description'])
-                    st.caption(f"📍 {act.get('location', '')} • ⏱️ {act.get('duration', '')} • 💵 ${act.get('cost', 0)}")
-                    if act.get('tips'):
-                        st.info(f"💡 {act['tips']}")
-                    st.markdown("---")
-        
-        with col3:
-            st.markdown("**🌙 Evening**")
-            for act in day.get('evening', []):
-                with st.container():
-                    st.markdown(f"**{act.get('time', '')}** - {act.get('activity', '')}")
-                    if act.get('description'):
-                        st.caption(act['description'])
-                    st.caption(f"📍 {act.get('location', '')} • ⏱️ {act.get('duration', '')} • 💵 ${act.get('cost', 0)}")
-                    if act.get('tips'):
-                        st.info(f"💡 {act['tips']}")
-                    st.markdown("---")
-        
-        # Day summary
-        st.markdown(f"""
-        **🚇 Getting Around:** {day.get('transportation', 'Walk/Metro')}  
-        **💰 Daily Budget:** ${day.get('total_cost', 0)}  
-        **⚡ Energy Level:** {day.get('energy_level', 'Moderate')}
-        """)
-        
-        if day.get('weather_considerations'):
-            st.caption(f"☁️ Weather: {day['weather_considerations']}")
-        
-        if day.get('flexibility_note'):
-            st.caption(f"✨ Optional: {day['flexibility_note']}")
-        
-        st.markdown("<br>", unsafe_allow_html=True)
+        render_day(day, start_date)
+
+
+def _render_slot(label: str, activities: List[Dict]):
+    """Render one part of the day as a single markdown block"""
+    blocks = []
+    for act in activities:
+        lines = [f"**{act.get('time', '')}** - {act.get('activity', '')}"]
+        if act.get('description'):
+            lines.append(act['description'])
+        details = [f"📍 {act.get('location', '')}"]
+        if act.get('duration'):
+            details.append(f"⏱️ {act['duration']}")
+        details.append(f"💵 ${act.get('cost', 0)}")
+        lines.append(" • ".join(details))
+        if act.get('tips'):
+            lines.append(f"💡 {act['tips']}")
+        blocks.append("\n\n".join(lines))
+    
+    # Escape dollar signs so prices in one block aren't paired up as LaTeX
+    body = "\n\n---\n\n".join(blocks).replace("$", "\\$")
+    st.markdown(f"{label}\n\n{body}")
+
+
+def render_day(day: Dict, start_date: str):
+    """Render a single day of the calendar timeline"""
+    day_num = day.get('day', 0)
+    date_str = day.get('date', start_date)
+    day_of_week = day.get('day_of_week', '')
+    title = day.get('title', f'Day {day_num}')
+    
+    # Calendar card for each day
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                padding: 1rem; border-radius: 10px; margin: 1rem 0; color: white;'>
+        <h3 style='margin: 0; color: white;'>Day {day_num} - {day_of_week}</h3>
+        <p style='margin: 0.5rem 0 0 0; opacity: 0.9;'>{date_str} • {title}</p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Timeline for the day
+    col1, col2, col3 = st.columns([1, 1, 1])
+    
+    with col1:
+        _render_slot("**🌅 Morning**", day.get('morning', []))
+    
+    with col2:
+        _render_slot("**☀️ Afternoon**", day.get('afternoon', []))
+    
+    with col3:
+        _render_slot("**🌙 Evening**", day.get('evening', []))
+    
+    # Day summary
+    st.markdown(f"""
+    **🚇 Getting Around:** {day.get('transportation', 'Walk/Metro')}  
+    **💰 Daily Budget:** ${day.get('total_cost', 0)}  
+    **⚡ Energy Level:** {day.get('energy_level', 'Moderate')}
+    """)
+    
+    if day.get('weather_considerations'):
+        st.caption(f"☁️ Weather: {day['weather_considerations']}")
+    
+    if day.get('flexibility_note'):
+        st.caption(f"✨ Optional: {day['flexibility_note']}")
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+
+
+# Fragment so ticking an item only reruns the packing list, not the page
+@st.fragment
+def render_packing_list(packing: Dict[str, List[str]], pack_keys: Dict[str, List[str]]):
+    """Render packing checklist"""
+    if packing:
+        cols = st.columns(2)
+        for idx, (category, items) in enumerate(packing.items()):
+            with cols[idx % 2]:
+                st.markdown(f"### {category.replace('_', ' ').title()}")
+                for item, key in zip(items, pack_keys[category]):
+                    st.checkbox(item, key=key)
+                st.markdown("---")
+
+
+def render_welcome():
+    """Render welcome screen"""
+    st.markdown("### 👋 Welcome to AI Travel Planner")
+    st.info("👈 Fill out the form in the sidebar to create your personalized travel itinerary!")
+    
+    for col, (title, blurb) in zip(st.columns(3), _WELCOME_COLS):
+        with col:
+            st.markdown(f"#### {title}\n\n{blurb}")
+    
+    st.markdown(_WELCOME_BODY_MD)
 
 
 def main():
@@ -508,6 +1074,9 @@ def main():
     
     st.markdown('<h1 class="main-header">✈️ AI Travel Planner</h1>', unsafe_allow_html=True)
     
+    # Itinerary days stream in here while the plan is being generated
+    live_itinerary = st.empty()
+    
     # Sidebar form
     with st.sidebar:
         st.header("Plan Your Trip")
@@ -555,20 +1124,29 @@ def main():
                     status_text.text("🤖 Analyzing destination...")
                     progress_bar.progress(20)
                     
-                    season = ["winter", "spring", "summer", "fall"][(start_date.month % 12) // 3]
+                    season = _SEASON_BY_MONTH[start_date.month]
                     start_date_str = start_date.strftime('%Y-%m-%d')
                     
                     status_text.text("⚡ Generating detailed itinerary...")
                     progress_bar.progress(40)
                     
-                    results = EnhancedTravelPlannerAI.generate_all_parallel(
+                    live_days = live_itinerary.container()
+                    live_days.markdown("### 📅 Trip Timeline")
+                    
+                    def show_day(day: Dict):
+                        with live_days:
+                            render_day(day, start_date_str)
+                    
+                    results = asyncio.run(EnhancedTravelPlannerAI.generate_all_fused(
                         origin, destination, days, travelers, 
-                        prefs or ["Culture"], budget.lower(), season, start_date_str
-                    )
+                        prefs or ["Culture"], budget.lower(), season, start_date_str,
+                        on_day=show_day
+                    ))
                     
                     progress_bar.progress(90)
                     status_text.text("✨ Finalizing your plan...")
                     
+                    st.session_state.plan_key = f"{origin}_{destination}_{start_date_str}_{start_time}"
                     st.session_state.trip_plan = {
                         "origin": origin,
                         "destination": destination,
@@ -584,21 +1162,35 @@ def main():
                         "packing": results.get('packing', {})
                     }
                     
+                    # Short checkbox keys built once per plan; ticks from the
+                    # previous plan's list are cleared since keys are reused
+                    for key in [k for k in st.session_state if k.startswith('pack_')]:
+                        del st.session_state[key]
+                    st.session_state.trip_plan['_pack_keys'] = {
+                        category: [f"pack_{i}_{j}" for j in range(len(items))]
+                        for i, (category, items) in enumerate(st.session_state.trip_plan['packing'].items())
+                    }
+                    
                     elapsed = time.time() - start_time
                     progress_bar.progress(100)
                     status_text.text(f"✅ Complete in {elapsed:.1f}s!")
+                    for error in results['errors']:
+                        st.warning(f"⚠️ Part of the plan could not be generated: {error}")
                     time.sleep(1)
                     progress_bar.empty()
                     status_text.empty()
+                    live_itinerary.empty()
                     
                 except Exception as e:
                     st.error(f"Error: {str(e)}")
                     progress_bar.empty()
                     status_text.empty()
+                    live_itinerary.empty()
     
     # Main content
     if st.session_state.trip_plan:
         plan = st.session_state.trip_plan
+        plan_key = st.session_state.plan_key
         
         # Route display with origin
         st.markdown(
@@ -739,16 +1331,7 @@ def main():
         
         with tab4:
             st.subheader("🧳 Complete Packing List")
-            packing = plan.get('packing', {})
-            
-            if packing:
-                cols = st.columns(2)
-                for idx, (category, items) in enumerate(packing.items()):
-                    with cols[idx % 2]:
-                        st.markdown(f"### {category.replace('_', ' ').title()}")
-                        for item in items:
-                            st.checkbox(item, key=f"pack_{idx}_{item}")
-                        st.markdown("---")
+            render_packing_list(plan.get('packing', {}), plan.get('_pack_keys', {}))
         
         with tab5:
             st.subheader("📋 Trip Summary")
@@ -774,7 +1357,7 @@ def main():
             st.markdown("---")
             st.download_button(
                 "📥 Download Complete Itinerary (JSON)",
-                data=json.dumps(plan, indent=2),
+                data=_plan_to_json(plan_key, plan),
                 file_name=f"trip_{plan['origin']}_{plan['destination']}_{datetime.now().strftime('%Y%m%d')}.json",
                 mime="application/json",
                 use_container_width=True
@@ -784,55 +1367,10 @@ def main():
             st.markdown("### 📤 Share Your Itinerary")
             st.info("Copy this summary to share with travel companions!")
             
-            share_text = f"""
-🌍 Trip to {plan['destination']}
-📅 {plan['dates']}
-✈️ From {plan['origin']}
-👥 {plan['travelers']} travelers
-💰 {plan['budget_level']} budget
-
-Daily Highlights:
-"""
-            for day in itinerary[:5]:  # First 5 days
-                share_text += f"\nDay {day.get('day')}: {day.get('title', 'Explore')}"
-            
-            st.code(share_text, language=None)
+            st.code(_plan_share_text(plan_key, plan), language=None)
     
     else:
-        # Welcome screen
-        st.markdown("### 👋 Welcome to AI Travel Planner")
-        st.info("👈 Fill out the form in the sidebar to create your personalized travel itinerary!")
-        
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            st.markdown("#### ⚡ Fast & Detailed")
-            st.write("Get comprehensive itineraries in 15-30 seconds with hour-by-hour planning")
-        with col2:
-            st.markdown("#### 🎯 AI-Powered")
-            st.write("Smart recommendations based on your preferences and budget")
-        with col3:
-            st.markdown("#### 📍 Real Places")
-            st.write("Actual attractions, restaurants, and local tips from AI knowledge")
-        
-        st.markdown("---")
-        st.markdown("### 🌟 What You'll Get:")
-        st.markdown("""
-        - **Detailed Daily Itineraries** - Hour-by-hour plans with descriptions, costs, and insider tips
-        - **Visual Calendar View** - See your entire trip at a glance
-        - **Destination Guide** - Learn about attractions, food, culture, and safety
-        - **Complete Budget Breakdown** - Know exactly what to expect to spend
-        - **Smart Packing List** - Don't forget anything important
-        - **Downloadable Plans** - Take your itinerary offline
-        """)
-        
-        st.markdown("---")
-        st.markdown("### 💡 Pro Tips:")
-        st.markdown("""
-        - **Origin matters** - We'll plan your arrival and departure logistics
-        - **Pick 2-3 interests** - More focused = better recommendations  
-        - **Budget level** - This affects accommodation, dining, and activity choices
-        - **Trip length** - 3-7 days works best, longer trips take more time to generate
-        """)
+        render_welcome()
 
 
 if __name__ == "__main__":